@@ -0,0 +1 @@
+"""BIDS sidecar generation for the PREVeNT study"""
@@ -0,0 +1 @@
+"""Metadata extractors for BIDS sidecar sources (EDF headers, F11 forms, XML annotations)"""
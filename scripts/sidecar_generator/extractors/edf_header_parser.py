@@ -4,107 +4,508 @@ EDF Header Parser for PREVeNT Study
 
 This module handles parsing of EDF file headers to extract metadata for BIDS sidecars.
 
-TODO: Implement actual EDF parsing using pyEDFlib or similar library
+The EDF header is plain fixed-width ASCII (a 256-byte main header followed by
+ns * 256 bytes of per-channel fields), so it is parsed directly from the file
+rather than through pyEDFlib.
 """
 
+import functools
+import json
 import os
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Any
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any, Tuple
 
 
-def extract_from_edf_header(edf_file_path: str) -> Dict[str, Any]:
+# Main header: version, patient, recording, startdate, starttime, header bytes,
+# reserved, number of data records, duration of a data record, number of signals
+_EDF_MAIN = struct.Struct('8s80s80s8s8s8s44s8s8s4s')
+_EDF_VERSION = b'0       '
+
+# Per-channel field widths in header order: label, transducer, physical dimension,
+# physical min/max, digital min/max, prefiltering, samples per record, reserved
+_EDF_CHANNEL_WIDTHS = (16, 80, 8, 8, 8, 8, 8, 80, 8, 32)
+
+# Set EDF_META_CACHE=1 to persist parsed headers next to each EDF as <edf>.meta.json
+_META_CACHE_SUFFIX = ".meta.json"
+# Bump when the metadata keys or their meaning change, so older cache files are ignored
+_META_CACHE_VERSION = 2
+
+
+@functools.lru_cache(maxsize=None)
+def _edf_channel_struct(ns: int) -> struct.Struct:
+    """Return the precompiled Struct for an ns-channel header block"""
+    return struct.Struct(''.join(f'{width}s' * ns for width in _EDF_CHANNEL_WIDTHS))
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """Stat path with a single syscall, returning None if it cannot be accessed or is not a valid path"""
+    try:
+        return os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+def _freeze(metadata: Dict[str, Any]) -> Mapping[str, Any]:
+    """Return a read-only view of metadata (lists become tuples) safe to share from a cache"""
+    return MappingProxyType({
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in metadata.items()
+    })
+
+
+def extract_from_edf_header(edf_file_path: str) -> Mapping[str, Any]:
     """
     Extract metadata from EDF file header
     
+    Results are cached per (path, mtime, size), so the header is parsed once per
+    file even when several sidecar generators ask for it; a modified file is re-parsed.
+    A read error returns placeholder metadata without caching it, so the next
+    call retries the read.
+    
     Args:
         edf_file_path: Path to the EDF file
         
     Returns:
-        Dictionary containing extracted metadata
+        Read-only mapping containing extracted metadata
         
-    TODO: Implement actual EDF header parsing
-    - Use pyEDFlib or similar library
-    - Extract sampling frequency, recording duration, channel info
-    - Handle different EDF variants (EDF+, BDF, etc.)
+    TODO: Handle other EDF variants (BDF uses 24-bit samples and a different version field)
     """
     
-    if not os.path.exists(edf_file_path):
+    st = _stat_or_none(edf_file_path)
+    if st is None:
         print(f"Warning: EDF file not found: {edf_file_path}")
-        return _get_placeholder_metadata()
+        return _freeze(_get_placeholder_metadata())
+    
+    try:
+        return _extract_from_edf_header_cached(edf_file_path, st.st_mtime, st.st_size)
+    except OSError as e:
+        print(f"Warning: Could not read EDF header of {edf_file_path}: {e}")
+        return _freeze(_get_placeholder_metadata())
+
+
+def batch_extract_headers(edf_file_paths: List[str], workers: int = 8) -> Dict[str, Mapping[str, Any]]:
+    """
+    Extract metadata from many EDF headers concurrently
+    
+    Header reads are small blocking I/O, so a thread pool overlaps the per-file
+    latency (significant on network shares). Results also populate the
+    per-file cache used by extract_from_edf_header.
+    
+    Args:
+        edf_file_paths: Paths to the EDF files
+        workers: Maximum number of reader threads
+        
+    Returns:
+        Dictionary mapping each path to its extracted metadata
+    """
+    if not edf_file_paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(edf_file_paths))) as executor:
+        return dict(zip(edf_file_paths, executor.map(extract_from_edf_header, edf_file_paths)))
+
+
+@functools.lru_cache(maxsize=1024)
+def _extract_from_edf_header_cached(edf_file_path: str, mtime: float, size: int) -> Mapping[str, Any]:
+    """
+    Parse and freeze the EDF header; mtime and size only serve as the cache key
+    
+    A malformed header caches placeholder metadata. OSError propagates so that
+    a transient read failure is not cached.
+    """
+    use_disk_cache = os.environ.get("EDF_META_CACHE") == "1"
+    if use_disk_cache:
+        metadata = _load_meta_cache(edf_file_path, mtime, size)
+        if metadata is not None:
+            return _freeze(metadata)
     
-    # TODO: Implement actual EDF parsing
-    # Example implementation would be:
-    # import pyedflib
-    # f = pyedflib.EdfReader(edf_file_path)
-    # sampling_frequency = f.getSampleFrequency(0)  # for first channel
-    # recording_duration = f.file_duration
-    # channel_count = f.signals_in_file
-    # channel_names = [f.getLabel(i) for i in range(channel_count)]
-    # f.close()
+    try:
+        metadata = _parse_edf_header(edf_file_path)
+        if use_disk_cache:
+            _write_meta_cache(edf_file_path, mtime, size, metadata)
+        return _freeze(metadata)
+    except ValueError as e:
+        print(f"Warning: Could not parse EDF header of {edf_file_path}: {e}")
+        return _freeze(_get_placeholder_metadata())
+
+
+def _load_meta_cache(edf_file_path: str, edf_mtime: float, edf_size: int) -> Optional[Dict[str, Any]]:
+    """
+    Load previously parsed metadata from <edf>.meta.json
     
-    print(f"TODO: Parsing EDF file: {edf_file_path}")
-    print("      Currently returning placeholder values")
+    The cache file is only used if it has the current format version, was
+    written for an EDF with the same mtime and size, and holds exactly the
+    metadata keys of _get_placeholder_metadata().
     
-    # Return placeholder structure for now
-    return _get_placeholder_metadata()
+    Returns:
+        Metadata dictionary, or None if there is no usable cache file
+    """
+    meta_path = edf_file_path + _META_CACHE_SUFFIX
+    try:
+        with open(meta_path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if not isinstance(cache, dict):
+        return None
+    if (cache.get("version") != _META_CACHE_VERSION or cache.get("edf_mtime") != edf_mtime
+            or cache.get("edf_size") != edf_size):
+        return None
+    metadata = cache.get("metadata")
+    if not isinstance(metadata, dict) or metadata.keys() != _get_placeholder_metadata().keys():
+        return None
+    return metadata
+
+
+def _write_meta_cache(edf_file_path: str, edf_mtime: float, edf_size: int, metadata: Dict[str, Any]) -> None:
+    """Write metadata to <edf>.meta.json atomically (temp file + os.replace)"""
+    meta_path = edf_file_path + _META_CACHE_SUFFIX
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    cache = {
+        "version": _META_CACHE_VERSION,
+        "edf_mtime": edf_mtime,
+        "edf_size": edf_size,
+        "metadata": metadata
+    }
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, meta_path)
+    except OSError as e:
+        print(f"Warning: Could not write EDF metadata cache {meta_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _parse_edf_header(edf_file_path: str) -> Dict[str, Any]:
+    """
+    Parse the fixed-width EDF main header and channel header block
+    
+    Both header blocks are read into a buffer once and unpacked in place with
+    precompiled Structs; only the fields exposed in the metadata are decoded.
+    
+    Args:
+        edf_file_path: Path to the EDF file
+        
+    Returns:
+        Dictionary with the same keys as _get_placeholder_metadata()
+    """
+    with open(edf_file_path, 'rb') as f:
+        main = bytearray(_EDF_MAIN.size)
+        if f.readinto(main) < _EDF_MAIN.size:
+            raise ValueError("truncated main header")
+        (_, patient, recording, start_date, start_time, header_bytes, _,
+         number_of_records, record_duration, ns) = _EDF_MAIN.unpack_from(main, 0)
+        ns = int(ns)
+        if ns < 0:
+            raise ValueError("invalid signal count")
+        channel_struct = _edf_channel_struct(ns)
+        chan = bytearray(channel_struct.size)
+        if f.readinto(chan) < channel_struct.size:
+            raise ValueError("truncated channel header")
+    
+    patient = patient.decode('ascii', 'replace').strip()
+    recording = recording.decode('ascii', 'replace').strip()
+    start_date = start_date.decode('ascii', 'replace').strip()
+    start_time = start_time.decode('ascii', 'replace').strip()
+    header_bytes = int(header_bytes)
+    number_of_records = int(number_of_records)
+    record_duration = float(record_duration)
+    
+    values = channel_struct.unpack_from(chan, 0)
+    
+    def field(index: int) -> List[str]:
+        # Labels, units and filter settings repeat across channels and files, so
+        # intern them to share one object per distinct value in cached headers
+        return [sys.intern(v.decode('ascii', 'replace').strip()) for v in values[index * ns:(index + 1) * ns]]
+    
+    labels = field(0)
+    units = field(2)
+    physical_minimum = [float(v) for v in values[3 * ns:4 * ns]]
+    physical_maximum = [float(v) for v in values[4 * ns:5 * ns]]
+    digital_minimum = [int(v) for v in values[5 * ns:6 * ns]]
+    digital_maximum = [int(v) for v in values[6 * ns:7 * ns]]
+    prefiltering = field(7)
+    samples_per_record = [int(v) for v in values[8 * ns:9 * ns]]
+    
+    sampling_frequency = None
+    if ns and record_duration > 0:
+        sampling_frequency = samples_per_record[0] / record_duration
+    
+    # EDF+ recording field: "Startdate dd-MMM-yyyy admincode technician equipment"
+    equipment_info = None
+    recording_parts = recording.split()
+    if len(recording_parts) >= 5 and recording_parts[0] == "Startdate":
+        equipment_info = recording_parts[4]
+    
+    return {
+        "sampling_frequency": sampling_frequency,
+        "recording_duration": number_of_records * record_duration if number_of_records >= 0 else None,
+        "recording_start_time": f"{start_date} {start_time}",
+        "number_of_channels": ns,
+        "channel_names": labels,
+        "channel_units": units,
+        "digital_minimum": digital_minimum,
+        "digital_maximum": digital_maximum,
+        "physical_minimum": physical_minimum,
+        "physical_maximum": physical_maximum,
+        "prefiltering": prefiltering,
+        "patient_info": patient,
+        "recording_info": recording,
+        "equipment_info": equipment_info,
+        "header_bytes": header_bytes,
+        "number_of_records": number_of_records,
+        "record_duration": record_duration,
+        "samples_per_record": samples_per_record
+    }
 
 
 def _get_placeholder_metadata() -> Dict[str, Any]:
     """
     Return placeholder metadata structure
     
+    Used when the EDF file is missing or its header cannot be parsed.
+    
     Returns:
-        Dictionary with placeholder values matching expected EDF metadata
+        Dictionary with the keys of the parsed metadata, all set to None
     """
     return {
-        "sampling_frequency": None,  # TODO: Extract from EDF header
-        "recording_duration": None,  # TODO: Extract from EDF header (in seconds)
-        "recording_start_time": None,  # TODO: Extract from EDF header
-        "number_of_channels": None,  # TODO: Extract from EDF header
-        "channel_names": None,  # TODO: Extract from EDF header (list of strings)
-        "channel_units": None,  # TODO: Extract from EDF header (list of units)
-        "digital_minimum": None,  # TODO: Extract from EDF header
-        "digital_maximum": None,  # TODO: Extract from EDF header
-        "physical_minimum": None,  # TODO: Extract from EDF header  
-        "physical_maximum": None,  # TODO: Extract from EDF header
-        "prefiltering": None,  # TODO: Extract from EDF header
-        "patient_info": None,  # TODO: Extract from EDF header
-        "recording_info": None,  # TODO: Extract from EDF header
-        "equipment_info": None  # TODO: Extract from EDF header if available
+        "sampling_frequency": None,  # Of the first channel (in Hz)
+        "recording_duration": None,  # In seconds
+        "recording_start_time": None,  # "dd.mm.yy hh.mm.ss" as stored in the header
+        "number_of_channels": None,
+        "channel_names": None,  # List of strings
+        "channel_units": None,  # List of units
+        "digital_minimum": None,
+        "digital_maximum": None,
+        "physical_minimum": None,
+        "physical_maximum": None,
+        "prefiltering": None,
+        "patient_info": None,
+        "recording_info": None,
+        "equipment_info": None,  # From the EDF+ recording field, if present
+        "header_bytes": None,
+        "number_of_records": None,
+        "record_duration": None,  # Duration of one data record (in seconds)
+        "samples_per_record": None  # Samples per data record, per channel
     }
 
 
-def extract_channel_info(edf_file_path: str) -> Dict[str, Any]:
+def extract_channel_info(edf_file_path: str) -> Mapping[str, Any]:
     """
     Extract channel-specific information for channels.tsv generation
     
+    Cached per (path, mtime, size) like extract_from_edf_header, including not
+    caching results of read errors.
+    
     Args:
         edf_file_path: Path to the EDF file
         
     Returns:
-        Dictionary containing channel information
+        Read-only mapping containing channel information
     """
     
-    # TODO: Implement channel-specific extraction
-    # This would extract:
-    # - Channel names
-    # - Channel types (EEG, ECG, EMG, etc.)
-    # - Sampling frequencies per channel
-    # - Units per channel
-    # - Reference information
+    st = _stat_or_none(edf_file_path)
+    if st is None:
+        return _extract_channel_info_cached(edf_file_path, None, None)
+    try:
+        return _extract_channel_info_cached(edf_file_path, st.st_mtime, st.st_size)
+    except OSError as e:
+        print(f"Warning: Could not read EDF file {edf_file_path}: {e}")
+        return _freeze(_get_placeholder_channel_info())
+
+
+@functools.lru_cache(maxsize=1024)
+def _extract_channel_info_cached(edf_file_path: str, mtime: Optional[float], size: Optional[int]) -> Mapping[str, Any]:
+    """Build and freeze the channel information; mtime and size only serve as the cache key"""
+    
+    if mtime is None:
+        return _freeze(_get_placeholder_channel_info())
+    
+    header = _extract_from_edf_header_cached(edf_file_path, mtime, size)
+    if not header["number_of_channels"]:
+        return _freeze(_get_placeholder_channel_info())
+    
+    record_duration = header["record_duration"]
+    sampling_frequencies = [
+        spr / record_duration if record_duration > 0 else None
+        for spr in header["samples_per_record"]
+    ]
+    cutoffs = [_parse_prefiltering(p) for p in header["prefiltering"]]
+    
+    # TODO: Extract reference information (not stored in the EDF header)
+    return _freeze({
+        "channel_names": list(header["channel_names"]),
+        "channel_types": [_channel_type(label) for label in header["channel_names"]],
+        "sampling_frequencies": sampling_frequencies,
+        "units": list(header["channel_units"]),
+        "low_cutoff": [low for low, _ in cutoffs],
+        "high_cutoff": [high for _, high in cutoffs],
+        "reference": ["n/a"] * header["number_of_channels"],
+        "status": _channel_status(edf_file_path, header)
+    })
+
+
+def _get_placeholder_channel_info() -> Dict[str, Any]:
+    """
+    Return placeholder channel information structure
     
+    Returns:
+        Dictionary with empty per-channel lists
+    """
     return {
-        "channel_names": [],  # TODO: List of channel names
-        "channel_types": [],  # TODO: List of channel types
-        "sampling_frequencies": [],  # TODO: List of sampling frequencies
-        "units": [],  # TODO: List of units
-        "low_cutoff": [],  # TODO: List of low cutoff frequencies
-        "high_cutoff": [],  # TODO: List of high cutoff frequencies
-        "reference": [],  # TODO: List of reference channels
-        "status": []  # TODO: List of channel status (good/bad)
+        "channel_names": [],  # List of channel names
+        "channel_types": [],  # List of channel types
+        "sampling_frequencies": [],  # List of sampling frequencies
+        "units": [],  # List of units
+        "low_cutoff": [],  # List of low cutoff frequencies
+        "high_cutoff": [],  # List of high cutoff frequencies
+        "reference": [],  # List of reference channels
+        "status": []  # List of channel status (good/bad)
     }
 
 
+# Label prefixes (EDF+ "<type> <sensor>" convention) mapped to BIDS channel types
+_CHANNEL_TYPE_PREFIXES = (
+    ("EEG", "EEG"),
+    ("ECG", "ECG"),
+    ("EKG", "ECG"),
+    ("EMG", "EMG"),
+    ("EOG", "EOG")
+)
+
+_EDF_ANNOTATIONS_LABEL = "EDF Annotations"
+
+
+def _channel_type(label: str) -> str:
+    """Infer the BIDS channel type from an EDF channel label"""
+    upper = label.upper()
+    for prefix, channel_type in _CHANNEL_TYPE_PREFIXES:
+        if upper.startswith(prefix):
+            return channel_type
+    if label == _EDF_ANNOTATIONS_LABEL:
+        return "TRIG"
+    return "MISC"
+
+
+def _parse_prefiltering(prefiltering: str) -> Tuple[Any, Any]:
+    """
+    Parse high-pass/low-pass cutoffs from an EDF prefiltering field (e.g. "HP:0.1Hz LP:70Hz")
+    
+    Returns:
+        (low_cutoff, high_cutoff) in Hz, "n/a" where not specified
+    """
+    low_cutoff = high_cutoff = "n/a"
+    for token in prefiltering.split():
+        name, _, value = token.partition(':')
+        try:
+            frequency = float(value.upper().rstrip('HZ'))
+        except ValueError:
+            continue
+        if name.upper() == "HP":
+            low_cutoff = frequency
+        elif name.upper() == "LP":
+            high_cutoff = frequency
+    return low_cutoff, high_cutoff
+
+
+def _channel_status(edf_file_path: str, header: Mapping[str, Any]) -> List[str]:
+    """
+    Mark flat channels (constant signal over the whole recording) as bad
+    
+    Returns:
+        "good"/"bad" per channel, "n/a" for annotation channels or when the
+        signal data is malformed
+        
+    Raises:
+        OSError: If the signal data cannot be read (left uncached by the caller)
+    """
+    ns = header["number_of_channels"]
+    try:
+        ranges = _physical_channel_ranges(edf_file_path, header)
+    except ImportError:
+        print("Warning: numpy is not installed, skipping channel status detection")
+        ranges = None
+    except ValueError as e:
+        print(f"Warning: Could not read EDF signal data of {edf_file_path}: {e}")
+        ranges = None
+    if ranges is None:
+        return ["n/a"] * ns
+    
+    status = []
+    for label, low, high in zip(header["channel_names"], *ranges):
+        if label == _EDF_ANNOTATIONS_LABEL:
+            status.append("n/a")
+        else:
+            status.append("bad" if low == high else "good")
+    return status
+
+
+def _physical_channel_ranges(edf_file_path: str, header: Mapping[str, Any]) -> Optional[Tuple[List[float], List[float]]]:
+    """
+    Compute per-channel physical minimum and maximum over all data records
+    
+    The data-record region is memory-mapped as little-endian int16 in one call
+    and reduced in its native int16 form; only the resulting per-channel extremes
+    are scaled to physical units, so the samples are never widened to float.
+    
+    Returns:
+        (minimums, maximums) lists, or None if the file holds no complete data record
+        
+    Raises:
+        ValueError: If a channel declares a negative or zero number of samples per record
+    """
+    import numpy as np
+    
+    ns = header["number_of_channels"]
+    samples_per_record = header["samples_per_record"]
+    record_samples = sum(samples_per_record)
+    header_bytes = header["header_bytes"]
+    if record_samples <= 0:
+        return None
+    if min(samples_per_record) <= 0:
+        raise ValueError("invalid samples per record")
+    
+    available_records = (os.path.getsize(edf_file_path) - header_bytes) // (2 * record_samples)
+    n_records = header["number_of_records"]
+    if n_records < 0 or n_records > available_records:
+        n_records = available_records
+    if n_records <= 0:
+        return None
+    
+    records = np.memmap(edf_file_path, dtype='<i2', mode='r', offset=header_bytes,
+                        shape=(n_records, record_samples))
+    
+    if len(set(samples_per_record)) == 1:
+        signals = records.reshape(n_records, ns, samples_per_record[0])
+        digital_low = signals.min(axis=(0, 2))
+        digital_high = signals.max(axis=(0, 2))
+    else:
+        bounds = np.cumsum((0,) + tuple(samples_per_record))
+        digital_low = np.array([records[:, bounds[i]:bounds[i + 1]].min() for i in range(ns)])
+        digital_high = np.array([records[:, bounds[i]:bounds[i + 1]].max() for i in range(ns)])
+    
+    digital_minimum = np.asarray(header["digital_minimum"], dtype=np.float64)
+    digital_maximum = np.asarray(header["digital_maximum"], dtype=np.float64)
+    physical_minimum = np.asarray(header["physical_minimum"], dtype=np.float64)
+    physical_maximum = np.asarray(header["physical_maximum"], dtype=np.float64)
+    digital_range = digital_maximum - digital_minimum
+    digital_range[digital_range == 0] = 1
+    scale = (physical_maximum - physical_minimum) / digital_range
+    bias = physical_minimum - scale * digital_minimum
+    
+    # A negative scale (inverted physical range) swaps which extreme is the minimum
+    low = digital_low * scale + bias
+    high = digital_high * scale + bias
+    return np.minimum(low, high).tolist(), np.maximum(low, high).tolist()
+
+
 def validate_edf_file(edf_file_path: str) -> bool:
     """
     Validate that the file is a proper EDF file
@@ -116,14 +517,12 @@ def validate_edf_file(edf_file_path: str) -> bool:
         True if valid EDF file, False otherwise
     """
     
-    if not os.path.exists(edf_file_path):
+    # The version field (first 8 bytes) is "0" padded with spaces in EDF and EDF+
+    try:
+        with open(edf_file_path, 'rb') as f:
+            return f.read(8) == _EDF_VERSION
+    except OSError:
         return False
-    
-    # TODO: Implement EDF validation
-    # Check file signature, header structure, etc.
-    
-    # Basic file extension check for now
-    return edf_file_path.lower().endswith('.edf')
 
 
 # For testing
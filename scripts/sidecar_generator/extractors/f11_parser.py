@@ -8,9 +8,102 @@ Different sidecar generators can request different fields from the same F11 form
 TODO: Implement actual F11 form parsing based on form structure
 """
 
+import dataclasses
+import functools
 import os
+import sys
+from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+
+
+@dataclass(slots=True, frozen=True)
+class F11Record:
+    """Flat per-patient F11 data; frozen so cached records can be shared safely"""
+    # demographics
+    age: Optional[float] = None
+    sex: Optional[str] = None
+    handedness: Optional[str] = None
+    date_of_birth: Optional[str] = None
+    # recording_parameters
+    task_description: Optional[str] = "resting state EEG"
+    institution: Optional[str] = None
+    equipment_manufacturer: Optional[str] = None
+    equipment_model: Optional[str] = None
+    sampling_rate: Optional[float] = None
+    recording_duration: Optional[float] = None
+    # clinical_info
+    diagnosis: Optional[str] = None
+    medications: Optional[str] = None
+    clinical_notes: Optional[str] = None
+    # study_info
+    visit_date: Optional[str] = None
+    visit_type: Optional[str] = None
+    protocol_version: Optional[str] = None
+    
+    def __post_init__(self):
+        # Share one string object per distinct value for low-cardinality fields,
+        # since many patient records repeat the same institution/equipment/etc.
+        for name in _F11_INTERNED_FIELDS:
+            value = getattr(self, name)
+            if isinstance(value, str):
+                object.__setattr__(self, name, sys.intern(value))
+
+
+# F11Record string fields with few distinct values across patients
+_F11_INTERNED_FIELDS = ("sex", "handedness", "task_description", "institution",
+                        "equipment_manufacturer", "equipment_model", "visit_type",
+                        "protocol_version")
+
+
+# F11 form sections and the F11Record fields belonging to each, used to resolve
+# dotted field paths such as "demographics.age" and section paths such as "demographics"
+_F11_SECTIONS = {
+    "demographics": ("age", "sex", "handedness", "date_of_birth"),
+    "recording_parameters": ("task_description", "institution", "equipment_manufacturer",
+                             "equipment_model", "sampling_rate", "recording_duration"),
+    "clinical_info": ("diagnosis", "medications", "clinical_notes"),
+    "study_info": ("visit_date", "visit_type", "protocol_version")
+}
+
+
+# F11Record fields returned by each per-sidecar extraction (keys match attribute
+# names), with a getter that reads them all in one call
+_EEG_JSON_FIELDS = ("task_description", "institution", "equipment_manufacturer",
+                    "equipment_model", "sampling_rate", "recording_duration")
+_PARTICIPANTS_TSV_FIELDS = ("age", "sex", "handedness")
+_SESSIONS_TSV_FIELDS = ("visit_date", "visit_type", "protocol_version")
+
+_get_eeg_json_fields = attrgetter(*_EEG_JSON_FIELDS)
+_get_participants_tsv_fields = attrgetter(*_PARTICIPANTS_TSV_FIELDS)
+_get_sessions_tsv_fields = attrgetter(*_SESSIONS_TSV_FIELDS)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_paths(field_paths: Tuple[str, ...]) -> Tuple[Tuple[str, Any], ...]:
+    """
+    Resolve dot-separated field paths once per distinct field list
+    
+    Args:
+        field_paths: Tuple of field paths (e.g., ("demographics.age", "study_info"))
+        
+    Returns:
+        Tuple of (result key, target) pairs, where target is the F11Record
+        attribute for a field path, the tuple of the section's attributes for a
+        section path, or None if the path is unknown,
+        e.g. (("age", "age"), ("study_info", ("visit_date", "visit_type", "protocol_version")))
+    """
+    compiled = []
+    for field_path in field_paths:
+        parts = field_path.split('.')
+        target = None
+        if len(parts) == 1:
+            target = _F11_SECTIONS.get(parts[0])
+        elif len(parts) == 2 and parts[1] in _F11_SECTIONS.get(parts[0], ()):
+            target = parts[1]
+        compiled.append((parts[-1], target))
+    return tuple(compiled)
 
 
 class F11Parser:
@@ -24,7 +117,6 @@ class F11Parser:
             f11_data_directory: Directory containing F11 forms/data
         """
         self.f11_data_directory = f11_data_directory or self._find_f11_directory()
-        self.cached_data = {}  # Cache parsed data to avoid re-parsing
     
     def _find_f11_directory(self) -> Optional[str]:
         """
@@ -42,7 +134,7 @@ class F11Parser:
         # - database/API endpoint
         return None
     
-    def get_patient_f11_data(self, patient_id: str) -> Dict[str, Any]:
+    def get_patient_f11_data(self, patient_id: str) -> F11Record:
         """
         Get all F11 data for a specific patient
         
@@ -50,50 +142,28 @@ class F11Parser:
             patient_id: Patient identifier (e.g., "13UL")
             
         Returns:
-            Dictionary containing all F11 data for the patient
-            
-        TODO: Implement actual F11 data retrieval
+            F11Record containing all F11 data for the patient
+        """
+        return self._load(patient_id, self.f11_data_directory)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _load(patient_id: str, f11_data_directory: Optional[str]) -> F11Record:
         """
-        if patient_id in self.cached_data:
-            return self.cached_data[patient_id]
+        Load F11 data for a patient, memoized process-wide per (patient, data directory)
+        
+        The cache is shared by every F11Parser using the same data directory.
         
+        TODO: Implement actual F11 data retrieval
+        """
         # TODO: Implement F11 data loading
         # This could be:
         # - Reading from Excel/CSV files
         # - Querying a database
         # - Parsing structured forms
         
-        # Placeholder structure based on common F11 sections
-        f11_data = {
-            "demographics": {
-                "age": None,
-                "sex": None,
-                "handedness": None,
-                "date_of_birth": None
-            },
-            "recording_parameters": {
-                "task_description": "resting state EEG",
-                "institution": None,
-                "equipment_manufacturer": None,
-                "equipment_model": None,
-                "sampling_rate": None,
-                "recording_duration": None
-            },
-            "clinical_info": {
-                "diagnosis": None,
-                "medications": None,
-                "clinical_notes": None
-            },
-            "study_info": {
-                "visit_date": None,
-                "visit_type": None,
-                "protocol_version": None
-            }
-        }
-        
-        # Cache the data
-        self.cached_data[patient_id] = f11_data
-        return f11_data
+        # Placeholder record; every field keeps its default until loading is implemented
+        return F11Record()
     
     def extract_for_eeg_json(self, patient_id: str) -> Dict[str, Any]:
         """
@@ -105,16 +175,8 @@ class F11Parser:
         Returns:
             Dictionary with fields needed for EEG JSON
         """
-        f11_data = self.get_patient_f11_data(patient_id)
-        
-        return {
-            "task_description": f11_data["recording_parameters"]["task_description"],
-            "institution": f11_data["recording_parameters"]["institution"],
-            "equipment_manufacturer": f11_data["recording_parameters"]["equipment_manufacturer"],
-            "equipment_model": f11_data["recording_parameters"]["equipment_model"],
-            "sampling_rate": f11_data["recording_parameters"]["sampling_rate"],
-            "recording_duration": f11_data["recording_parameters"]["recording_duration"]
-        }
+        record = self.get_patient_f11_data(patient_id)
+        return dict(zip(_EEG_JSON_FIELDS, _get_eeg_json_fields(record)))
     
     def extract_for_participants_tsv(self, patient_id: str) -> Dict[str, Any]:
         """
@@ -126,13 +188,8 @@ class F11Parser:
         Returns:
             Dictionary with fields needed for participants.tsv
         """
-        f11_data = self.get_patient_f11_data(patient_id)
-        
-        return {
-            "age": f11_data["demographics"]["age"],
-            "sex": f11_data["demographics"]["sex"],
-            "handedness": f11_data["demographics"]["handedness"]
-        }
+        record = self.get_patient_f11_data(patient_id)
+        return dict(zip(_PARTICIPANTS_TSV_FIELDS, _get_participants_tsv_fields(record)))
     
     def extract_for_sessions_tsv(self, patient_id: str) -> Dict[str, Any]:
         """
@@ -144,13 +201,8 @@ class F11Parser:
         Returns:
             Dictionary with fields needed for sessions.tsv
         """
-        f11_data = self.get_patient_f11_data(patient_id)
-        
-        return {
-            "visit_date": f11_data["study_info"]["visit_date"],
-            "visit_type": f11_data["study_info"]["visit_type"],
-            "protocol_version": f11_data["study_info"]["protocol_version"]
-        }
+        record = self.get_patient_f11_data(patient_id)
+        return dict(zip(_SESSIONS_TSV_FIELDS, _get_sessions_tsv_fields(record)))
     
     def extract_custom_fields(self, patient_id: str, field_list: List[str]) -> Dict[str, Any]:
         """
@@ -158,43 +210,31 @@ class F11Parser:
         
         Args:
             patient_id: Patient identifier
-            field_list: List of field paths (e.g., ["demographics.age", "recording_parameters.institution"])
+            field_list: List of field paths (e.g., ["demographics.age", "recording_parameters.institution"]);
+                a bare section name (e.g., "demographics") requests all fields of that section
             
         Returns:
-            Dictionary with requested fields
+            Dictionary with requested fields (a dict of fields for sections, None for unknown paths)
         """
-        f11_data = self.get_patient_f11_data(patient_id)
+        record = self.get_patient_f11_data(patient_id)
         result = {}
         
-        for field_path in field_list:
-            value = self._get_nested_field(f11_data, field_path)
-            # Use the last part of the path as the key
-            field_name = field_path.split('.')[-1]
-            result[field_name] = value
-        
-        return result
-    
-    def _get_nested_field(self, data: Dict, field_path: str) -> Any:
-        """
-        Get a nested field from the F11 data using dot notation
-        
-        Args:
-            data: The F11 data dictionary
-            field_path: Dot-separated path (e.g., "demographics.age")
-            
-        Returns:
-            Field value or None if not found
-        """
-        parts = field_path.split('.')
-        current = data
-        
-        for part in parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
+        # Use the last part of the path as the key
+        for field_name, target in _compile_paths(tuple(field_list)):
+            if target is None:
+                result[field_name] = None
+            elif isinstance(target, tuple):
+                result[field_name] = {attribute: getattr(record, attribute) for attribute in target}
             else:
-                return None
+                result[field_name] = getattr(record, target)
         
-        return current
+        return result
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_parser() -> F11Parser:
+    """Return the process-wide F11Parser so its per-patient cache survives between calls"""
+    return F11Parser()
 
 
 # Convenience function for easy importing
@@ -207,9 +247,9 @@ def extract_from_f11_form(patient_id: str, extraction_type: str = "eeg_json") ->
         extraction_type: Type of extraction ("eeg_json", "participants_tsv", "sessions_tsv", or "custom")
         
     Returns:
-        Extracted F11 data
+        Extracted F11 data (all F11Record fields as a flat dictionary for "custom")
     """
-    parser = F11Parser()
+    parser = _shared_parser()
     
     if extraction_type == "eeg_json":
         return parser.extract_for_eeg_json(patient_id)
@@ -219,7 +259,7 @@ def extract_from_f11_form(patient_id: str, extraction_type: str = "eeg_json") ->
         return parser.extract_for_sessions_tsv(patient_id)
     else:
         # For custom extractions, return all data
-        return parser.get_patient_f11_data(patient_id)
+        return dataclasses.asdict(parser.get_patient_f11_data(patient_id))
 
 
 # For testing
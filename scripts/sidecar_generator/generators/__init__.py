@@ -0,0 +1 @@
+"""BIDS sidecar file generators"""
@@ -3,36 +3,76 @@
 EEG JSON sidecar generator for BIDS format
 
 This script generates the *_task-rest_eeg.json sidecar files required by BIDS.
-Currently creates skeleton files with empty/placeholder values.
+Field values come from the EDF header (sampling frequency, recording duration,
+channel count) and the F11 form (task description, institution, equipment info),
+following the field mapping in sidecar_config.yaml; fields with no source keep
+their defaults.
 
-TODO: Implement actual data extraction from:
-- EDF headers (sampling frequency, recording duration, etc.)
-- F11 forms (task description, institution, equipment info)
-- XML annotations (if needed for task-specific metadata)
+TODO: Add XML annotations as a source (if needed for task-specific metadata)
 """
 
+import functools
+import importlib
+import importlib.util
 import json
+import math
 import os
 import sys
-import yaml
 from pathlib import Path
 
-# Import extractors
-sys.path.append(str(Path(__file__).parent.parent / "extractors"))
-from edf_header_parser import extract_from_edf_header
-from f11_parser import extract_from_f11_form
+# orjson is optional; the stdlib encoder produces the same 2-space indented output
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+# Extractors, yaml and the process pool are imported where they are used, so
+# importing this module (or passing pre-parsed EDF metadata) stays cheap
 
-def map_fields_from_sources(source_data_dict, field_mapping_config):
+
+class SidecarGenerationError(Exception):
+    """Raised when the sidecar for one recording cannot be generated"""
+
+
+@functools.lru_cache(maxsize=None)
+def _extractor(module_name):
     """
-    Map fields from source data based on configuration
+    Return an extractors module, imported once and cached
+    
+    Inside the package this is a normal relative import. When this file is run
+    directly as a script, the module is loaded from its file with importlib
+    instead of adding the extractors directory to sys.path.
+    """
+    if __package__:
+        return importlib.import_module(f"..extractors.{module_name}", __package__)
+    
+    module_path = Path(__file__).parent.parent / "extractors" / f"{module_name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# Config source names mapped to our source data keys
+_SOURCE_KEYS = {
+    "edf_header": "edf",
+    "f11_form": "f11",
+    "xml_annotations": "xml"
+}
+
+
+def _compile_mapping(field_mapping_config):
+    """
+    Flatten a sources/field_mapping configuration into lookup tuples
     
     Args:
-        source_data_dict (dict): All available source data {"edf": {...}, "f11": {...}}
         field_mapping_config (list): Configuration defining which fields to use
+            (None when the config section is empty)
         
     Returns:
-        dict: Mapped fields for BIDS JSON
+        tuple: (bids_field, source_key, source_field) tuples in config order;
+        sources with an unknown name are dropped
         
     Example config:
     sources:
@@ -45,57 +85,282 @@ def map_fields_from_sources(source_data_dict, field_mapping_config):
           "TaskName": "task_description"
           "InstitutionName": "institution"
     """
-    mapped_fields = {}
+    compiled = []
+    for source_config in field_mapping_config or []:
+        source_key = _SOURCE_KEYS.get(source_config.get("source"))
+        if source_key is None:
+            continue
+        for bids_field, source_field in (source_config.get("field_mapping") or {}).items():
+            compiled.append((bids_field, source_key, source_field))
+    return tuple(compiled)
+
+
+def map_fields_from_sources(source_data_dict, compiled_mapping):
+    """
+    Map fields from source data based on configuration
     
-    for source_config in field_mapping_config:
-        source_name = source_config.get("source")
-        field_mapping = source_config.get("field_mapping", {})
-        
-        # Map source names to our data keys
-        source_key_mapping = {
-            "edf_header": "edf",
-            "f11_form": "f11", 
-            "xml_annotations": "xml"
-        }
+    Args:
+        source_data_dict (dict): All available source data {"edf": {...}, "f11": {...}}
+        compiled_mapping (tuple): Field mapping compiled by _compile_mapping
         
-        source_key = source_key_mapping.get(source_name)
-        if source_key and source_key in source_data_dict:
-            source_data = source_data_dict[source_key]
-            
-            for bids_field, source_field in field_mapping.items():
-                if source_field in source_data:
-                    mapped_fields[bids_field] = source_data[source_field]
-                    print(f"✅ Mapped {bids_field} = {source_data[source_field]} (from {source_name}.{source_field})")
-                else:
-                    print(f"⚠️  Field {source_field} not found in {source_name} data")
+    Returns:
+        dict: Mapped fields for BIDS JSON
+    """
+    mapped_fields = {}
+    mapped_count = 0
+    not_found = []
+    
+    for bids_field, source_key, source_field in compiled_mapping:
+        source_data = source_data_dict.get(source_key)
+        if source_data is None:
+            continue
+        if source_field in source_data:
+            mapped_fields[bids_field] = source_data[source_field]
+            mapped_count += 1
+        else:
+            not_found.append(f"{source_key}.{source_field}")
+    
+    # One summary line per sidecar rather than one line per field
+    if compiled_mapping:
+        print(f"✅ Mapped {mapped_count}/{len(compiled_mapping)} configured fields")
+    if not_found:
+        print(f"⚠️  Fields not found in source data: {', '.join(not_found)}")
     
     return mapped_fields
 
 
-def load_configs():
-    """Load both BIDS structure and sidecar configuration files"""
-    # Get the script directory and navigate to config folder
-    script_dir = Path(__file__).parent.parent.parent.parent
-    config_dir = script_dir / "config"
+@functools.lru_cache(maxsize=8)
+def _load_yaml_cached(path, mtime):
+    """
+    Parse a YAML file once per (path, mtime)
+    
+    The result is shared by every caller. Apart from the derived keys that
+    load_configs deliberately stores on sidecars.eeg_json, callers must not
+    mutate it.
+    """
+    import yaml
+    # Prefer the LibYAML-backed loader; fall back to the pure-Python one if unavailable
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    # Hand the loader raw bytes; it detects the encoding itself (UTF-8/UTF-16 BOM)
+    with _open_noatime(path) as f:
+        return yaml.load(f, Loader=loader)
+
+
+def _open_noatime(path):
+    """
+    Open a file for binary reading without updating its access time where supported
+    
+    O_NOATIME exists only on Linux and is refused (EPERM) for files the caller
+    does not own, in which case the file is opened normally.
+    """
+    noatime = getattr(os, "O_NOATIME", 0)
+    try:
+        fd = os.open(path, os.O_RDONLY | noatime)
+    except PermissionError:
+        if not noatime:
+            raise
+        fd = os.open(path, os.O_RDONLY)
+    return os.fdopen(fd, 'rb')
+
+
+# BIDS EEG JSON fields in output order as (field, source key, source field, default).
+# A configured field mapping wins, then the source value, then the default;
+# fields without a source key always use the default unless mapped.
+_EEG_JSON_FIELDS = (
+    # Required fields
+    ("TaskName", "f11", "task_description", "rest"),
+    ("SamplingFrequency", "edf", "sampling_frequency", None),
+    
+    # Recommended fields
+    ("PowerLineFrequency", None, None, 60),  # TODO: Get from config or F11
+    ("SoftwareFilters", None, None, "n/a"),  # TODO: Get from EDF or F11
+    
+    # Optional fields that may be available
+    ("RecordingDuration", "edf", "recording_duration", None),
+    ("RecordingType", None, None, "continuous"),
+    ("EEGReference", "edf", "reference", ""),
+    ("EEGGround", "edf", "ground", ""),
+    
+    # Institution and equipment info
+    ("InstitutionName", "f11", "institution", None),
+    ("InstitutionAddress", "f11", "institution_address", ""),
+    ("Manufacturer", "f11", "equipment_manufacturer", None),
+    ("ManufacturersModelName", "f11", "equipment_model", None),
+    ("SoftwareVersions", "edf", "software_version", ""),
+    
+    # Subject and session info
+    ("SubjectArtefactDescription", None, None, ""),
+    
+    # Additional metadata
+    ("HowManyBadChannels", None, None, 0),
+    ("EEGChannelCount", "edf", "number_of_channels", None)
+)
+
+# Every EEG JSON key in output order; copying it gives a dict already sized for all fields
+_EEG_JSON_KEYS = dict.fromkeys(field for field, _, _, _ in _EEG_JSON_FIELDS)
+
+# The indented JSON layout of exactly those keys with one %s slot per value. Used
+# by the stdlib fallback when every value is a scalar, so only the values are encoded
+_EEG_JSON_LAYOUT = "{\n" + ",\n".join(f"  {json.dumps(field)}: %s" for field in _EEG_JSON_KEYS) + "\n}"
+_JSON_SCALAR_TYPES = (str, int, float, bool, type(None))
+_JSON_CONSTANTS = {None: "null", True: "true", False: "false"}
+
+
+def _encode_json_scalar(value):
+    """Encode one scalar exactly as the stdlib path of _encode_json would"""
+    if isinstance(value, str):
+        return json.encoder.encode_basestring(value)
+    if value is None or value is True or value is False:
+        return _JSON_CONSTANTS[value]
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if not math.isfinite(value):
+        return "null"
+    return float.__repr__(value)
+
+
+def _non_finite_to_none(data):
+    """Return data with NaN and infinite floats (nested in dicts/lists/tuples) replaced by None"""
+    if isinstance(data, float):
+        return data if math.isfinite(data) else None
+    if isinstance(data, dict):
+        return {key: _non_finite_to_none(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_non_finite_to_none(value) for value in data]
+    return data
+
+
+# Output directories already created by this process
+_made_dirs = set()
+
+
+def _ensure_output_dir(output_path):
+    """Create the parent directory of output_path once per process"""
+    output_dir = os.path.dirname(output_path)
+    if output_dir and output_dir not in _made_dirs:
+        os.makedirs(output_dir, exist_ok=True)
+        _made_dirs.add(output_dir)
+
+
+def _write_atomic(output_path, data):
+    """
+    Write bytes to output_path in one write, replacing the file atomically
+    
+    The data goes to a temporary file that is renamed over output_path, so a
+    failed or interrupted run never leaves a truncated sidecar behind. The
+    temporary name includes the process id, so batch workers writing the same
+    path do not clobber each other's temporary file.
+    """
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@functools.lru_cache(maxsize=1)
+def _cbor2():
+    """Return the cbor2 module, or None (warning once per process) if it is not installed"""
+    try:
+        import cbor2
+    except ImportError:
+        print("⚠️  Warning: SIDECAR_EMIT_CBOR is set but cbor2 is not installed, skipping CBOR output")
+        return None
+    return cbor2
+
+
+def _write_cbor_copy(output_path, data):
+    """
+    Write data as CBOR next to the JSON sidecar (<name>.cbor); requires cbor2
+    
+    The CBOR copy is optional, so failures only print a warning.
+    """
+    cbor2 = _cbor2()
+    if cbor2 is None:
+        return
+    cbor_path = os.path.splitext(output_path)[0] + ".cbor"
+    try:
+        _write_atomic(cbor_path, cbor2.dumps(data))
+    except Exception as e:
+        print(f"⚠️  Warning: Could not write EEG CBOR sidecar {cbor_path}: {e}")
+        return
+    print(f"✅ EEG CBOR sidecar created: {cbor_path}")
+
+
+def _encode_eeg_json(eeg_json):
+    """
+    Serialize an EEG JSON sidecar exactly as _encode_json would
     
-    structure_config_path = config_dir / "bids_structure.yaml"
-    sidecar_config_path = config_dir / "sidecar_config.yaml"
+    Without orjson, a sidecar holding just the standard fields with scalar values
+    is spliced into the precomputed layout; anything else uses the full encoder.
+    """
+    if orjson is None and eeg_json.keys() == _EEG_JSON_KEYS.keys():
+        values = tuple(eeg_json.values())
+        if all(isinstance(value, _JSON_SCALAR_TYPES) for value in values):
+            return (_EEG_JSON_LAYOUT % tuple(_encode_json_scalar(value) for value in values)).encode('utf-8')
+    return _encode_json(eeg_json)
+
+
+def _encode_json(data):
+    """
+    Serialize data as 2-space indented UTF-8 JSON bytes
+    
+    With either encoder, values JSON cannot represent natively (e.g. YAML dates
+    and datetimes) are written via str(), and NaN or infinite floats become null.
+    The only remaining difference is float notation (orjson writes 1e16 where
+    the stdlib writes 1e+16), which parses to the same value.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                            | orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(_non_finite_to_none(data), indent=2, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def _required_eeg_json_fields(sidecar_config):
+    """Return the required EEG JSON fields from the validation config as a frozenset"""
+    return frozenset(sidecar_config.get('validation', {}).get('eeg_json_required_fields', []))
+
+
+def _load_config(config_path):
+    """Load one YAML configuration file, exiting with an error that names the file"""
+    import yaml
     
     try:
-        with open(structure_config_path, 'r') as f:
-            structure_config = yaml.safe_load(f)
-        with open(sidecar_config_path, 'r') as f:
-            sidecar_config = yaml.safe_load(f)
-        return structure_config, sidecar_config
-    except FileNotFoundError as e:
-        print(f"Error: Configuration file not found: {e}")
+        return _load_yaml_cached(str(config_path), os.path.getmtime(config_path))
+    except FileNotFoundError:
+        print(f"Error: Configuration file not found: {config_path}")
         sys.exit(1)
     except yaml.YAMLError as e:
-        print(f"Error: Invalid YAML configuration: {e}")
+        print(f"Error: Invalid YAML configuration in {config_path}: {e}")
         sys.exit(1)
 
 
-def create_eeg_json(output_path, edf_file_path, patient_id, session_age):
+def load_configs():
+    """Load both BIDS structure and sidecar configuration files (cached until they change)"""
+    # Get the script directory and navigate to config folder
+    script_dir = Path(__file__).parent.parent.parent.parent
+    config_dir = script_dir / "config"
+    
+    structure_config = _load_config(config_dir / "bids_structure.yaml")
+    sidecar_config = _load_config(config_dir / "sidecar_config.yaml")
+    
+    # Precompute once per parsed config and store the derived keys on the cached
+    # dict itself, so they are reused until the file changes (empty sections become {})
+    sidecars = sidecar_config['sidecars'] = sidecar_config.get('sidecars') or {}
+    eeg_config = sidecars['eeg_json'] = sidecars.get('eeg_json') or {}
+    if '_required_set' not in eeg_config:
+        eeg_config['_required_set'] = _required_eeg_json_fields(sidecar_config)
+        eeg_config['_compiled_sources'] = _compile_mapping(eeg_config.get('sources'))
+    return structure_config, sidecar_config
+
+
+def create_eeg_json(output_path, edf_file_path, patient_id, session_age, edf_metadata=None, configs=None):
     """
     Generate EEG JSON sidecar file
     
@@ -104,25 +369,37 @@ def create_eeg_json(output_path, edf_file_path, patient_id, session_age):
         edf_file_path (str): Source EDF file path
         patient_id (str): Patient identifier (e.g., "13UL")
         session_age (str): Session age (e.g., "24")
+        edf_metadata (dict): Pre-parsed EDF header metadata (e.g., from
+            batch_extract_headers); parsed from edf_file_path when omitted
+        configs (tuple): Preloaded (structure_config, sidecar_config) from
+            load_configs(); loaded here when omitted
+    
+    Raises:
+        SidecarGenerationError: If the EDF file is invalid or the sidecar cannot be written
     """
     
     # Load configurations
-    structure_config, sidecar_config = load_configs()
-    eeg_config = sidecar_config['sidecars']['eeg_json']
+    structure_config, sidecar_config = configs if configs is not None else load_configs()
+    eeg_config = sidecar_config.get('sidecars', {}).get('eeg_json') or {}
     
     print(f"Generating EEG JSON sidecar: {output_path}")
     print(f"Source EDF: {edf_file_path}")
     print(f"Patient: {patient_id}, Session: {session_age}")
     
+    if edf_metadata is None:
+        edf_header_parser = _extractor("edf_header_parser")
+        extract_from_edf_header = edf_header_parser.extract_from_edf_header
+        validate_edf_file = edf_header_parser.validate_edf_file
+        if not validate_edf_file(edf_file_path):
+            raise SidecarGenerationError(f"Not a valid EDF file: {edf_file_path}")
+    extract_from_f11_form = _extractor("f11_parser").extract_from_f11_form
+    
     # Extract ALL available data from sources (comprehensive extraction)
     try:
-        edf_metadata = extract_from_edf_header(edf_file_path)  # Gets ALL EDF fields
+        if edf_metadata is None:
+            edf_metadata = extract_from_edf_header(edf_file_path)  # Gets ALL EDF fields
         f11_metadata = extract_from_f11_form(patient_id)       # Gets ALL F11 fields
-        
-        # Get field mapping configuration for EEG JSON
-        eeg_field_config = eeg_config.get('sources', [])
-        print(f"📋 Available EDF fields: {list(edf_metadata.keys())}")
-        print(f"📋 Available F11 fields: {list(f11_metadata.keys())}")
+        print(f"📋 Available source fields: EDF={len(edf_metadata)}, F11={len(f11_metadata)}")
         
     except Exception as e:
         print(f"⚠️  Warning: Error extracting metadata: {e}")
@@ -138,65 +415,47 @@ def create_eeg_json(output_path, edf_file_path, patient_id, session_age):
     }
     
     # Map fields based on configuration (if available)
-    mapped_fields = {}
-    if eeg_config and 'sources' in eeg_config:
-        mapped_fields = map_fields_from_sources(all_source_data, eeg_config['sources'])
-    
-    # Create the BIDS-compliant EEG JSON structure
-    # Use mapped fields when available, fall back to direct access for now
-    eeg_json = {
-        # Required fields - try mapped first, then direct access
-        "TaskName": mapped_fields.get("TaskName", f11_metadata.get("task_description", "rest")),
-        "SamplingFrequency": mapped_fields.get("SamplingFrequency", edf_metadata.get("sampling_frequency")),
-        
-        # Recommended fields  
-        "PowerLineFrequency": mapped_fields.get("PowerLineFrequency", 60),  # TODO: Get from config or F11
-        "SoftwareFilters": mapped_fields.get("SoftwareFilters", "n/a"),     # TODO: Get from EDF or F11
-        
-        # Optional fields that may be available
-        "RecordingDuration": mapped_fields.get("RecordingDuration", edf_metadata.get("recording_duration")),
-        "RecordingType": mapped_fields.get("RecordingType", "continuous"),
-        "EEGReference": mapped_fields.get("EEGReference", edf_metadata.get("reference", "")),
-        "EEGGround": mapped_fields.get("EEGGround", edf_metadata.get("ground", "")),
-        
-        # Institution and equipment info
-        "InstitutionName": mapped_fields.get("InstitutionName", f11_metadata.get("institution")),
-        "InstitutionAddress": mapped_fields.get("InstitutionAddress", f11_metadata.get("institution_address", "")),
-        "Manufacturer": mapped_fields.get("Manufacturer", f11_metadata.get("equipment_manufacturer")),
-        "ManufacturersModelName": mapped_fields.get("ManufacturersModelName", f11_metadata.get("equipment_model")),
-        "SoftwareVersions": mapped_fields.get("SoftwareVersions", edf_metadata.get("software_version", "")),
-        
-        # Subject and session info
-        "SubjectArtefactDescription": mapped_fields.get("SubjectArtefactDescription", ""),
-        
-        # Additional metadata
-        "HowManyBadChannels": mapped_fields.get("HowManyBadChannels", 0),
-        "EEGChannelCount": mapped_fields.get("EEGChannelCount", edf_metadata.get("number_of_channels")),
-        
-        # Development info (remove when fully implemented)
-        "_dev_info": {
+    compiled_sources = eeg_config.get('_compiled_sources')
+    if compiled_sources is None:
+        compiled_sources = _compile_mapping(eeg_config.get('sources'))
+    mapped_fields = map_fields_from_sources(all_source_data, compiled_sources)
+    
+    # Create the BIDS-compliant EEG JSON structure in one pass over the field table
+    eeg_json = _EEG_JSON_KEYS.copy()
+    for field, source_key, source_field, default in _EEG_JSON_FIELDS:
+        if field in mapped_fields:
+            eeg_json[field] = mapped_fields[field]
+        elif source_key is not None:
+            eeg_json[field] = all_source_data[source_key].get(source_field, default)
+        else:
+            eeg_json[field] = default
+    
+    # Development info, only written when SIDECAR_DEV=1 (remove when fully implemented)
+    if os.environ.get("SIDECAR_DEV") == "1":
+        eeg_json["_dev_info"] = {
             "note": "Field mapping system active - remove this section when fully implemented",
             "mapped_fields_used": list(mapped_fields.keys()),
             "available_edf_fields": list(edf_metadata.keys()),
             "available_f11_fields": list(f11_metadata.keys())
         }
-    }
     
     # Ensure output directory exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    _ensure_output_dir(output_path)
     
     # Write JSON file with proper formatting
     try:
-        with open(output_path, 'w') as f:
-            json.dump(eeg_json, f, indent=2, ensure_ascii=False)
+        _write_atomic(output_path, _encode_eeg_json(eeg_json))
         print(f"✅ EEG JSON sidecar created: {output_path}")
         
+        # Optional binary copy for programmatic consumers; the JSON stays for BIDS
+        if os.environ.get("SIDECAR_EMIT_CBOR") == "1":
+            _write_cbor_copy(output_path, eeg_json)
+        
         # TODO: Add validation against BIDS schema
         validate_eeg_json(eeg_json, sidecar_config)
         
     except Exception as e:
-        print(f"❌ Error creating EEG JSON sidecar: {e}")
-        sys.exit(1)
+        raise SidecarGenerationError(f"Error creating EEG JSON sidecar {output_path}: {e}") from e
 
 
 def validate_eeg_json(eeg_json, sidecar_config):
@@ -211,12 +470,13 @@ def validate_eeg_json(eeg_json, sidecar_config):
     - BIDS schema requirements
     - Custom validation rules from config
     """
-    required_fields = sidecar_config.get('validation', {}).get('eeg_json_required_fields', [])
+    eeg_config = sidecar_config.get('sidecars', {}).get('eeg_json') or {}
+    required_fields = eeg_config.get('_required_set')
+    if required_fields is None:
+        required_fields = _required_eeg_json_fields(sidecar_config)
     
-    missing_fields = []
-    for field in required_fields:
-        if field not in eeg_json or eeg_json[field] is None or eeg_json[field] == "":
-            missing_fields.append(field)
+    present_fields = {field for field, value in eeg_json.items() if value is not None and value != ""}
+    missing_fields = sorted(required_fields - present_fields)
     
     if missing_fields:
         print(f"⚠️  Warning: Missing required fields: {missing_fields}")
@@ -225,11 +485,126 @@ def validate_eeg_json(eeg_json, sidecar_config):
         print("✅ All required fields present (though may contain placeholder values)")
 
 
+# Configs preloaded into each batch worker process by _init_batch_worker
+_worker_configs = None
+
+
+def _init_batch_worker(configs):
+    """ProcessPoolExecutor initializer: keep the parent's configs for every job in this worker"""
+    global _worker_configs
+    _worker_configs = configs
+
+
+# Jobs handed to a batch worker at a time; their EDF headers are read concurrently
+_BATCH_CHUNK_SIZE = 8
+
+
+def _run_batch_jobs(jobs):
+    """
+    Generate a run of sidecars in the current (worker) process
+    
+    The EDF headers of the whole run are read concurrently first, so header I/O
+    overlaps instead of blocking once per job. A failing job is recorded and the
+    remaining jobs still run.
+    
+    Returns:
+        list: (output_path, error message) for every job that failed
+    """
+    batch_extract_headers = _extractor("edf_header_parser").batch_extract_headers
+    
+    # Warms the per-file header cache; create_eeg_json still validates each EDF,
+    # so malformed jobs are left to fail on their own below
+    batch_extract_headers([job[1] for job in jobs if _is_batch_job(job)])
+    failures = []
+    for job in jobs:
+        job_name = repr(job)
+        try:
+            output_path, edf_file_path, patient_id, session_age = job
+            job_name = output_path
+            create_eeg_json(output_path, edf_file_path, patient_id, session_age, configs=_worker_configs)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            failures.append((job_name, str(e)))
+    return failures
+
+
+def _is_batch_job(job):
+    """Return True if job is an [output_path, edf_file, patient_id, session_age] list of strings"""
+    return isinstance(job, (list, tuple)) and len(job) == 4 and all(isinstance(item, str) for item in job)
+
+
+def create_eeg_json_batch(jobs, workers=None):
+    """
+    Generate EEG JSON sidecars for many recordings in one batch
+    
+    Configs are loaded once in this process. Jobs are independent, so they are
+    spread in chunks over a process pool whose workers receive the configs once
+    through the pool initializer rather than with every task.
+    
+    Args:
+        jobs (list): (output_path, edf_file_path, patient_id, session_age) entries
+        workers (int): Number of worker processes (default: CPU count); 1 runs
+            every job serially in this process
+        
+    Returns:
+        list: (output_path, error message) for every job that failed, in job order
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    configs = load_configs()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    # Each worker takes whole chunks, so more workers than chunks would sit idle
+    chunks = [jobs[i:i + _BATCH_CHUNK_SIZE] for i in range(0, len(jobs), _BATCH_CHUNK_SIZE)]
+    workers = min(workers, len(chunks))
+    
+    if workers <= 1:
+        _init_batch_worker(configs)
+        return _run_batch_jobs(jobs)
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(configs,)) as executor:
+        return [failure for failures in executor.map(_run_batch_jobs, chunks) for failure in failures]
+
+
+def main_batch(workers=None):
+    """Batch entry point: read a JSON list of [output_path, edf_file, patient_id, session_age] from stdin"""
+    try:
+        jobs = json.load(sys.stdin)
+    except ValueError as e:
+        print(f"Error: Invalid batch manifest: {e}")
+        sys.exit(1)
+    if not isinstance(jobs, list):
+        print("Error: Invalid batch manifest: expected a JSON list of jobs")
+        sys.exit(1)
+    invalid = [index for index, job in enumerate(jobs) if not _is_batch_job(job)]
+    if invalid:
+        print(f"Error: Invalid batch manifest: entries {invalid} are not "
+              "[output_path, edf_file, patient_id, session_age] lists of strings")
+        sys.exit(1)
+    failures = create_eeg_json_batch(jobs, workers=workers)
+    if failures:
+        print(f"❌ {len(failures)}/{len(jobs)} batch jobs failed:")
+        for output_path, message in failures:
+            print(f"   {output_path}: {message}")
+        sys.exit(1)
+
+
 def main():
     """Main function for standalone testing"""
+    if sys.argv[1:2] == ["--batch"]:
+        if len(sys.argv) == 4 and sys.argv[2] == "--workers" and sys.argv[3].isdigit():
+            main_batch(workers=int(sys.argv[3]))
+            return
+        if len(sys.argv) == 2:
+            main_batch()
+            return
+    
     if len(sys.argv) != 5:
-        print("Usage: python create_eeg_json.py <output_path> <edf_file> <patient_id> <session_age>")
-        print("Example: python create_eeg_json.py output/sub-PRV-13UL_task-rest_eeg.json input/PRV-002-13UL-24.edf 13UL 24")
+        print("Usage: python -m scripts.sidecar_generator.generators.create_eeg_json <output_path> <edf_file> <patient_id> <session_age>")
+        print("       python -m scripts.sidecar_generator.generators.create_eeg_json --batch [--workers N] < jobs.json")
+        print("Example: python -m scripts.sidecar_generator.generators.create_eeg_json output/sub-PRV-13UL_task-rest_eeg.json input/PRV-002-13UL-24.edf 13UL 24")
         sys.exit(1)
     
     output_path = sys.argv[1]
@@ -237,7 +612,11 @@ def main():
     patient_id = sys.argv[3]
     session_age = sys.argv[4]
     
-    create_eeg_json(output_path, edf_file_path, patient_id, session_age)
+    try:
+        create_eeg_json(output_path, edf_file_path, patient_id, session_age)
+    except SidecarGenerationError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":